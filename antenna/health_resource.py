@@ -26,15 +26,23 @@ class VersionResource:
 
     def __init__(self, basedir):
         self.basedir = basedir
+        # version.json is part of the deploy and doesn't change while the process
+        # is running, so once it's been read, the response body is cached
+        self._version_text = None
 
     def on_get(self, req, resp):
         """Implement GET HTTP request."""
         METRICS.incr("collector.health.version.count")
-        version_info = get_version_info(self.basedir)
+        version_text = self._version_text
+        if version_text is None:
+            version_info = get_version_info(self.basedir)
+            version_text = json.dumps(version_info)
+            if version_info:
+                self._version_text = version_text
 
         resp.content_type = "application/json; charset=utf-8"
         resp.status = falcon.HTTP_200
-        resp.text = json.dumps(version_info)
+        resp.text = version_text
 
 
 class LBHeartbeatResource:
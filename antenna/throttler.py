@@ -14,7 +14,6 @@ import importlib
 import json
 import logging
 import random
-import re
 
 from everett.manager import Option
 
@@ -28,7 +27,15 @@ REJECT = 2  # throw the crash away
 FAKEACCEPT = 3  # return crashid as if we accepted, but throw away--USE CAUTION!
 CONTINUE = 4  # continue through rules
 
-RESULT_TO_TEXT = {0: "ACCEPT", 1: "DEFER", 2: "REJECT", 3: "FAKEACCEPT", 4: "CONTINUE"}
+# Indexed by result, so the result values above must stay 0 through 4 with no gaps
+RESULT_TO_TEXT = ("ACCEPT", "DEFER", "REJECT", "FAKEACCEPT", "CONTINUE")
+
+# Sentinel for keys that aren't in the crash report; this lets us do a single dict
+# lookup rather than a "key in crash" check followed by a second lookup
+MISSING = object()
+
+# Result returned when no rule matches the crash report
+NO_MATCH_RESULT = (REJECT, "NO_MATCH", 0)
 
 
 def safe_get(data, key, default=""):
@@ -42,7 +49,11 @@ def safe_get(data, key, default=""):
     :return: string value
 
     """
-    return str(data.get(key, default))
+    value = data.get(key, default)
+    # Most values are already strings, so skip the str() call for those
+    if type(value) is str:
+        return value
+    return str(value)
 
 
 def parse_attribute(val):
@@ -57,6 +68,21 @@ def parse_attribute(val):
         ) from exc
 
 
+def is_valid_rule_name(rule_name):
+    """Return whether rule_name has only ASCII alphanumeric characters and underscores.
+
+    :arg str rule_name: the rule name to check
+
+    :returns: bool
+
+    """
+    return (
+        bool(rule_name)
+        and rule_name.isascii()
+        and rule_name.replace("_", "x").isalnum()
+    )
+
+
 class Throttler:
     """Accept or reject incoming crashes based on specified rule set.
 
@@ -87,6 +113,12 @@ class Throttler:
 
         BREAKPAD_THROTTLER_RULES=myruleset.rules
 
+    .. Note::
+
+       Rules are compiled with ``Rule.compile()`` when they're assigned to
+       ``rule_set``. Changing a rule after that has no effect until ``rule_set``
+       is assigned again.
+
     """
 
     class Config:
@@ -110,6 +142,28 @@ class Throttler:
         self.config = config.with_options(self)
         self.rule_set = self.config("rules")
 
+        # These don't change at runtime, so resolve them once rather than every
+        # time a rule looks at them
+        self.products = frozenset(self.config("products"))
+        self.product_packagenames = {
+            product: frozenset(packagenames)
+            for product, packagenames in self.config("product_packagenames").items()
+        }
+
+    @property
+    def rule_set(self):
+        """The list of rules this throttler applies."""
+        return self._rule_set
+
+    @rule_set.setter
+    def rule_set(self, rule_set):
+        self._rule_set = rule_set
+
+        # Compile the rules into tuples so throttle() can unpack them into local
+        # variables rather than looking up attributes on Rule instances for every
+        # crash report
+        self._compiled_rules = [rule.compile() for rule in rule_set]
+
     def throttle(self, raw_crash):
         """Throttle an incoming crash report.
 
@@ -121,29 +175,61 @@ class Throttler:
         :returns tuple: ``(result, rule_name, percentage)``
 
         """
-        for rule in self.rule_set:
-            match = rule.match(self, raw_crash)
+        # Bind names used for every rule to locals so the loop does fast local
+        # lookups instead of global and attribute lookups
+        missing = MISSING
+        get_value = raw_crash.get
+
+        # This applies the rules the way Rule.match does, but using the tuples from
+        # Rule.compile
+        for (
+            key,
+            is_star,
+            always_matches,
+            condition,
+            result,
+            rule_name,
+            match_result,
+        ) in self._compiled_rules:
+            if is_star:
+                match = always_matches or condition(self, raw_crash)
+            else:
+                value = get_value(key, missing)
+                if value is missing:
+                    continue
+                if always_matches:
+                    match = True
+                else:
+                    if type(value) is not str:
+                        value = str(value)
+                    match = condition(self, value)
 
             if match:
-                if rule.result in (ACCEPT, DEFER, REJECT, FAKEACCEPT):
-                    return rule.result, rule.rule_name, 100
+                if match_result is not None:
+                    return match_result
 
-                if (random.random() * 100.0) <= rule.result[0]:  # noqa: S311
-                    response = rule.result[1]
+                if (random.random() * 100.0) <= result[0]:  # noqa: S311
+                    response = result[1]
                 else:
-                    response = rule.result[2]
+                    response = result[2]
 
                 if response != CONTINUE:
-                    return response, rule.rule_name, rule.result[0]
+                    return response, rule_name, result[0]
 
-        # None of the rules matched, so we defer
-        return REJECT, "NO_MATCH", 0
+        # None of the rules matched, so we reject
+        return NO_MATCH_RESULT
 
 
 class Rule:
-    """Defines a single rule."""
+    """Defines a single rule.
+
+    ``Throttler`` doesn't call ``match()`` for every crash report. It applies the
+    tuple from ``compile()`` instead. Subclasses that override ``match()`` are
+    compiled so the throttler calls their ``match()``.
 
-    RULE_NAME_RE = re.compile(r"^[a-z0-9_]+$", re.I)
+    """
+
+    __slots__ = ("rule_name", "key", "condition", "result", "_match_result")
 
     def __init__(self, rule_name, key, condition, result):
         """Create a Rule.
@@ -194,22 +280,57 @@ class Rule:
         self.condition = condition
         self.result = result
 
-        if not self.RULE_NAME_RE.match(self.rule_name):
+        # If the result is a single result, then the throttle result for a match is
+        # always the same, so build it now rather than for every crash report
+        if result in (ACCEPT, DEFER, REJECT, FAKEACCEPT):
+            self._match_result = (result, rule_name, 100)
+        else:
+            self._match_result = None
+
+        if not is_valid_rule_name(self.rule_name):
             raise ValueError("%r is not a valid rule name" % self.rule_name)
 
     def __repr__(self):
         """Return programmer-friendly representation."""
         return self.rule_name
 
+    def compile(self):
+        """Return this rule as a tuple for ``Throttler.throttle()``.
+
+        :returns: ``(key, is_star, always_matches, condition, result, rule_name,
+            match_result)`` where ``match_result`` is the throttle result for a
+            match if it's always the same or ``None``
+
+        """
+        key = self.key
+        condition = self.condition
+        if type(self).match is not Rule.match:
+            # Apply this rule as a "*" rule whose condition is the overridden match
+            key = "*"
+            condition = self.match
+
+        return (
+            key,
+            key == "*",
+            condition is always_match,
+            condition,
+            self.result,
+            self.rule_name,
+            self._match_result,
+        )
+
     def match(self, throttler, crash):
         """Apply this rule to the crash report."""
         if self.key == "*":
             return self.condition(throttler, crash)
 
-        if self.key in crash:
-            return self.condition(throttler, safe_get(crash, self.key))
+        value = crash.get(self.key, MISSING)
+        if value is MISSING:
+            return False
 
-        return False
+        if type(value) is not str:
+            value = str(value)
+        return self.condition(throttler, value)
 
 
 def always_match(throttler, crash):
@@ -217,26 +338,31 @@ def always_match(throttler, crash):
     return True
 
 
+# Version prefixes affected by the infobar bug
+INFOBAR_VERSION_PREFIXES = frozenset(
+    ["52.", "53.", "54.", "55.", "56.", "57.", "58.", "59."]
+)
+
+
 def match_infobar_true(throttler, data):
     """Match crashes we need to filter out due to infobar bug.
 
     Bug #1426949.
 
     """
-    product = safe_get(data, "ProductName")
-    infobar = safe_get(data, "SubmittedFromInfobar")
-    version = safe_get(data, "Version")
-    buildid = safe_get(data, "BuildID")
+    # Most crash reports aren't submitted from the infobar, so check that first and
+    # skip looking at anything else
+    if safe_get(data, "SubmittedFromInfobar") != "true":
+        return False
 
-    if not (product and infobar and version and buildid):
+    if safe_get(data, "ProductName") != "Firefox":
         return False
 
-    return (
-        product == "Firefox"
-        and infobar == "true"
-        and version.startswith(("52.", "53.", "54.", "55.", "56.", "57.", "58.", "59."))
-        and buildid < "20171226"
-    )
+    buildid = safe_get(data, "BuildID")
+    if not buildid or buildid >= "20171226":
+        return False
+
+    return safe_get(data, "Version")[:3] in INFOBAR_VERSION_PREFIXES
 
 
 def match_b2g(throttler, data):
@@ -246,7 +372,7 @@ def match_b2g(throttler, data):
 
     """
     is_b2g = (
-        "B2G" not in throttler.config("products")
+        "B2G" not in throttler.products
         and safe_get(data, "ProductName").lower() == "b2g"
     )
     if is_b2g:
@@ -257,7 +383,7 @@ def match_b2g(throttler, data):
 
 def match_unsupported_product(throttler, data):
     """Match unsupported products."""
-    products = throttler.config("products")
+    products = throttler.products
     product_name = safe_get(data, "ProductName")
     is_not_supported = products and product_name not in products
 
@@ -271,7 +397,7 @@ def match_unsupported_android_packagename(throttler, data):
     """Match unsupported Android_PackageName values"""
     product_name = safe_get(data, "ProductName")
 
-    packagenames = throttler.config("product_packagenames").get(product_name, [])
+    packagenames = throttler.product_packagenames.get(product_name, frozenset())
     packagename = safe_get(data, "Android_PackageName", default=None)
 
     is_not_supported = packagenames and packagename not in packagenames
@@ -291,24 +417,59 @@ def match_unsupported_android_packagename(throttler, data):
     return False
 
 
-BUILDID_RE = re.compile(r"^20\d{12}$")
+#: Build ids older than this are rejected
+OLD_BUILDID_AGE = datetime.timedelta(days=730)
+
+
+# (date, cutoff) where cutoff is the YYYYMMDD string for OLD_BUILDID_AGE before date
+_old_buildid_cutoff = (None, "")
+
+
+def get_old_buildid_cutoff():
+    """Return the YYYYMMDD cutoff for old build ids.
+
+    The cutoff only changes when the date changes, so it's computed once a day
+    rather than for every crash report.
+
+    :returns: YYYYMMDD string for the day 2 years ago
+
+    """
+    global _old_buildid_cutoff
+
+    today = datetime.date.today()
+    cutoff_date, cutoff = _old_buildid_cutoff
+    if cutoff_date != today:
+        cutoff = (today - OLD_BUILDID_AGE).strftime("%Y%m%d")
+        _old_buildid_cutoff = (today, cutoff)
+    return cutoff
 
 
 def match_old_buildid(throttler, data):
-    """Match build ids that are > 2 years old."""
+    """Match build ids that are > 2 years old.
+
+    Build ids start with YYYYMMDD, so we compare that to the cutoff date as strings
+    rather than parsing it into a datetime.
+
+    """
     buildid = safe_get(data, "BuildID")
-    if BUILDID_RE.match(buildid) is None:
+    if not (
+        len(buildid) == 14
+        and buildid.startswith("20")
+        and buildid.isascii()
+        and buildid.isdigit()
+    ):
+        return False
+
+    if buildid[:8] > get_old_buildid_cutoff():
         return False
 
+    # If this buildid doesn't have a valid YYYYMMDD date, it's not a valid buildid we
+    # want to look at. This is after the cutoff check so most build ids skip it.
     try:
-        buildid_date = datetime.datetime.strptime(buildid[:8], "%Y%m%d")
+        datetime.date(int(buildid[:4]), int(buildid[4:6]), int(buildid[6:8]))
     except ValueError:
-        # If this buildid doesn't have a YYYYMMDD at the beginning, it's not a valid
-        # buildid we want to look at
         return False
-
-    now = datetime.datetime.now()
-    return buildid_date < (now - datetime.timedelta(days=730))
+    return True
 
 
 WINDOWS_8_1_BUILD_NUMBER = 9600
@@ -345,6 +506,63 @@ def match_unsupported_windows(throttler, data):
     return windows_build_number <= WINDOWS_8_1_BUILD_NUMBER
 
 
+def match_throttleable_0(throttler, value):
+    """Match Throttleable=0 which means it was submitted through about:crashes."""
+    return value == "0"
+
+
+BACKGROUND_PROCESS_TYPES = frozenset(["gpu", "plugin", "rdd", "socket", "utility"])
+
+
+def match_background_process(throttler, value):
+    """Match ProcessType values for background processes."""
+    return value in BACKGROUND_PROCESS_TYPES
+
+
+def match_shutdownkill(throttler, value):
+    """Match ipc_channel_error=ShutDownKill."""
+    return value == "ShutDownKill"
+
+
+ALPHA_BETA_ESR_CHANNELS = frozenset(["aurora", "beta", "esr"])
+
+
+def match_alpha_beta_esr(throttler, value):
+    """Match ReleaseChannel values for aurora, beta, and esr channels."""
+    return value in ALPHA_BETA_ESR_CHANNELS
+
+
+def match_nightly(throttler, value):
+    """Match ReleaseChannel values for nightly channels."""
+    return value.startswith("nightly")
+
+
+def match_hangid_and_browser(throttler, data):
+    """Match the browser side of multi-submission hang crashes."""
+    return (
+        "HangID" in data
+        and safe_get(data, "ProcessType", default="browser") == "browser"
+    )
+
+
+def match_firefox_esr_unsupported_windows(throttler, data):
+    """Match Firefox ESR crash reports from Windows versions we don't support."""
+    # NOTE: Non-str values never equal these strings, so we can skip safe_get
+    return (
+        data.get("ProductName") == "Firefox"
+        and data.get("ReleaseChannel") == "esr"
+        and match_unsupported_windows(throttler, data)
+    )
+
+
+def match_firefox_desktop_release(throttler, data):
+    """Match Firefox desktop release channel crash reports."""
+    # NOTE: Non-str values never equal these strings, so we can skip safe_get
+    return (
+        data.get("ProductName") == "Firefox" and data.get("ReleaseChannel") == "release"
+    )
+
+
 #: This accepts crash reports for all products
 ALL_PRODUCTS = []
 
@@ -408,12 +626,7 @@ MOZILLA_RULES = [
     Rule(
         rule_name="has_hangid_and_browser",
         key="*",
-        condition=(
-            lambda throttler, data: (
-                "HangID" in data
-                and safe_get(data, "ProcessType", default="browser") == "browser"
-            )
-        ),
+        condition=match_hangid_and_browser,
         result=REJECT,
     ),
     # Bug #1426949: Reject infobar=true crashes for certain versions of Firefox desktop
@@ -446,7 +659,7 @@ MOZILLA_RULES = [
     Rule(
         rule_name="throttleable_0",
         key="Throttleable",
-        condition=lambda throttler, x: x == "0",
+        condition=match_throttleable_0,
         result=ACCEPT,
     ),
     # Accept crash reports that have a comment
@@ -462,9 +675,7 @@ MOZILLA_RULES = [
     Rule(
         rule_name="is_background",
         key="ProcessType",
-        condition=lambda throttler, x: (
-            x in {"gpu", "plugin", "rdd", "socket", "utility"}
-        ),
+        condition=match_background_process,
         result=ACCEPT,
     ),
     # Bug #1624949: Throttle ipc_channel_error=ShutDownKill crash reports at
@@ -472,44 +683,35 @@ MOZILLA_RULES = [
     Rule(
         rule_name="is_shutdownkill",
         key="ipc_channel_error",
-        condition=lambda throttler, x: x == "ShutDownKill",
+        condition=match_shutdownkill,
         result=(10, CONTINUE, REJECT),
     ),
     # Accept 25% crash reports from Firefox ESR Windows <= 8.1
     Rule(
         rule_name="is_firefox_esr_unsupported_windows",
         key="*",
-        condition=(
-            lambda throttler, data: (
-                safe_get(data, "ProductName") == "Firefox"
-                and safe_get(data, "ReleaseChannel") == "esr"
-                and match_unsupported_windows(throttler, data)
-            )
-        ),
+        condition=match_firefox_esr_unsupported_windows,
         result=(25, CONTINUE, REJECT),
     ),
     # Accept crash reports in ReleaseChannel=aurora, beta, esr channels
     Rule(
         rule_name="is_alpha_beta_esr",
         key="ReleaseChannel",
-        condition=lambda throttler, x: x in ("aurora", "beta", "esr"),
+        condition=match_alpha_beta_esr,
         result=ACCEPT,
     ),
     # Accept crash reports in ReleaseChannel=nightly
     Rule(
         rule_name="is_nightly",
         key="ReleaseChannel",
-        condition=lambda throttler, x: x.startswith("nightly"),
+        condition=match_nightly,
         result=ACCEPT,
     ),
     # Accept 10%, reject 90% of Firefox desktop release channel
     Rule(
         rule_name="is_firefox_desktop",
         key="*",
-        condition=lambda throttler, data: (
-            safe_get(data, "ProductName") == "Firefox"
-            and safe_get(data, "ReleaseChannel") == "release"
-        ),
+        condition=match_firefox_desktop_release,
         result=(10, ACCEPT, REJECT),
     ),
     # Accept everything else
@@ -3,16 +3,15 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
 import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 import json
 import logging
+import os
 import re
 import string
 import time
-import uuid
 
 import isodate
-from more_itertools import peekable
 
 
 LOGGER = logging.getLogger(__name__)
@@ -74,6 +73,21 @@ def json_ordered_dumps(data):
     return json.dumps(data, sort_keys=True)
 
 
+# Date ordinal of the epoch; used to get today's UTC date ordinal from time.time()
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=16)
+def _get_crash_id_suffix(throttle_result, date_ordinal):
+    """Return the throttle_result + yymmdd suffix of a crash id
+
+    This only changes once a day per throttle result, so it's cached.
+
+    """
+    date = datetime.date.fromordinal(date_ordinal)
+    return "%d%02d%02d%02d" % (throttle_result, date.year % 100, date.month, date.day)
+
+
 def create_crash_id(timestamp=None, throttle_result=1):
     """Generate a crash id.
 
@@ -96,28 +110,35 @@ def create_crash_id(timestamp=None, throttle_result=1):
 
     """
     if timestamp is None:
-        timestamp = utc_now().date()
-
-    id_ = str(uuid.uuid4())
-    return "%s%d%02d%02d%02d" % (
-        id_[:-7],
-        throttle_result,
-        timestamp.year % 100,
-        timestamp.month,
-        timestamp.day,
+        # This is today in UTC without building a datetime
+        date_ordinal = int(time.time() // 86400) + _EPOCH_ORDINAL
+    else:
+        date_ordinal = timestamp.toordinal()
+
+    # This builds the first 29 characters of a str(uuid.uuid4()) without creating a
+    # UUID object
+    data = bytearray(os.urandom(16))
+    data[6] = (data[6] & 0x0F) | 0x40  # version 4
+    data[8] = (data[8] & 0x3F) | 0x80  # RFC 4122 variant
+    hex_ = data.hex()
+    return "%s-%s-%s-%s-%s%s" % (
+        hex_[:8],
+        hex_[8:12],
+        hex_[12:16],
+        hex_[16:20],
+        hex_[20:25],
+        _get_crash_id_suffix(throttle_result, date_ordinal),
     )
 
 
 CRASH_ID_RE = re.compile(
     r"""
-    ^
     [a-f0-9]{8}-
     [a-f0-9]{4}-
     [a-f0-9]{4}-
     [a-f0-9]{4}-
     [a-f0-9]{6}
     [0-9]{6}      # date in YYMMDD
-    $
 """,
     re.VERBOSE,
 )
@@ -133,7 +154,7 @@ def validate_crash_id(crash_id, strict=True):
 
     """
     # Assert the shape is correct
-    if not CRASH_ID_RE.match(crash_id):
+    if not CRASH_ID_RE.fullmatch(crash_id):
         return False
 
     # Check throttle character
@@ -173,6 +194,11 @@ def get_date_from_crash_id(crash_id, as_datetime=False):
 
 ALPHA_NUMERIC_UNDERSCORE = string.ascii_letters + string.digits + "_"
 
+# Bytes to remove from an ASCII-encoded key name
+_NON_KEY_NAME_BYTES = bytes(
+    b for b in range(256) if chr(b) not in ALPHA_NUMERIC_UNDERSCORE
+)
+
 
 def sanitize_key_name(val):
     """Sanitize a key name.
@@ -186,8 +212,9 @@ def sanitize_key_name(val):
         val = val.decode("utf-8")
 
     # Dump names can only contain ASCII alpha-numeric characters and
-    # underscores
-    val = "".join(v for v in val if v in ALPHA_NUMERIC_UNDERSCORE)
+    # underscores; encoding drops non-ascii characters and translate drops the
+    # rest
+    val = val.encode("ascii", "ignore").translate(None, _NON_KEY_NAME_BYTES).decode()
 
     # Dump names can't be longer than 30 characters
     val = val[:30]
@@ -282,7 +309,9 @@ def retry(
         @wraps(fun)
         def _retry_fun(*args, **kwargs):
             attempts = 0
-            wait_times = peekable(wait_time_generator())
+            # This is created on the first failure so successful calls don't pay for
+            # it
+            wait_times = None
             while True:
                 try:
                     ret = fun(*args, **kwargs)
@@ -298,8 +327,12 @@ def retry(
                         attempts,
                     )
 
+                    if wait_times is None:
+                        wait_times = wait_time_generator()
+                    next_wait = next(wait_times, None)
+
                     # If last attempt,
-                    if not wait_times:
+                    if next_wait is None:
                         raise MaxAttemptsError(
                             "Maximum retry attempts; last return %r." % ret, ret
                         )
@@ -320,12 +353,15 @@ def retry(
 
                     # If last attempt, raise MaxAttemptsError which will chain the
                     # current errror
-                    if not wait_times:
+                    if wait_times is None:
+                        wait_times = wait_time_generator()
+                    next_wait = next(wait_times, None)
+                    if next_wait is None:
                         raise MaxAttemptsError(
                             f"Maximum retry attempts: {exc!r}"
                         ) from exc
 
-                sleep_function(next(wait_times))
+                sleep_function(next_wait)
                 attempts += 1
 
         return _retry_fun
@@ -23,7 +23,7 @@ sys.path.insert(0, str(REPO_ROOT))
 logging.basicConfig(level=logging.INFO)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def config():
     cfg = ConfigManager([ConfigOSEnv()])
     return cfg
@@ -86,7 +86,7 @@ class GcsHelper:
         return [blob.name for blob in list(bucket.list_blobs(prefix=prefix))]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def storage_helper(config):
     """Generate and return a storage helper using env config."""
     return GcsHelper(
@@ -133,9 +133,14 @@ class PubSubHelper:
         return crashids
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def queue_helper(config):
-    """Generate and return a queue helper using env config."""
+    """Generate and return a queue helper using env config.
+
+    This is session-scoped so the Pub/Sub clients and their gRPC channels are
+    created once rather than for every test.
+
+    """
     return PubSubHelper(
         project_id=config("crashmover_crashpublish_project_id", default=""),
         topic_name=config("crashmover_crashpublish_topic_name", default=""),
@@ -69,11 +69,9 @@ def compress(multipart):
     :returns: bytes compressed
 
     """
-    bio = io.BytesIO()
-    g = gzip.GzipFile(fileobj=bio, mode="w")
-    g.write(multipart)
-    g.close()
-    return bio.getbuffer()
+    # mtime=0 makes the output deterministic and lets gzip do the whole thing in a
+    # single zlib call
+    return gzip.compress(multipart, compresslevel=6, mtime=0)
 
 
 def multipart_encode(raw_crash, boundary=None, mimetype="multipart/form-data"):
@@ -27,6 +27,19 @@ class TestHealthChecks:
         version_info = {"commit": "ou812"}
         assert json.loads(result.content) == version_info
 
+    def test_version_is_cached(self, client, tmpdir):
+        client.rebuild_app({"BASEDIR": str(tmpdir)})
+
+        version_path = tmpdir.join("/version.json")
+        version_path.write('{"commit": "ou812"}')
+        result = client.simulate_get("/__version__")
+        assert json.loads(result.content) == {"commit": "ou812"}
+
+        # Once version.json has been read, changes to it aren't picked up
+        version_path.write('{"commit": "5150"}')
+        result = client.simulate_get("/__version__")
+        assert json.loads(result.content) == {"commit": "ou812"}
+
     def test_lb_heartbeat(self, client):
         resp = client.simulate_get("/__lbheartbeat__")
         assert resp.status_code == 200
@@ -29,9 +29,15 @@ def throttler():
 
 
 class TestRule:
-    def test_invalid_rule_name(self):
+    @pytest.mark.parametrize("rule_name", ["", "o m g!", "rule-name", "r\u00fcle"])
+    def test_invalid_rule_name(self, rule_name):
         with pytest.raises(ValueError):
-            Rule("o m g!", "*", lambda throttler, x: True, ACCEPT)
+            Rule(rule_name, "*", lambda throttler, x: True, ACCEPT)
+
+    @pytest.mark.parametrize("rule_name", ["rule", "Rule_1", "_", "is_nightly"])
+    def test_valid_rule_name(self, rule_name):
+        rule = Rule(rule_name, "*", lambda throttler, x: True, ACCEPT)
+        assert rule.rule_name == rule_name
 
     def test_star(self, throttler):
         def is_crash(throttler, thing):
@@ -79,6 +85,40 @@ class TestRule:
             # Above the percentage line, so DEFER!
             assert throttler.throttle({"ProductName": "test"}) == (REJECT, "test", 50)
 
+    def test_no_match(self, throttler):
+        throttler.rule_set = [
+            Rule("test", "ProductName", lambda throttler, x: x == "test", ACCEPT)
+        ]
+
+        assert throttler.throttle({"ProductName": "Test"}) == (REJECT, "NO_MATCH", 0)
+
+    def test_compile(self):
+        condition = lambda throttler, x: x == "test"  # noqa
+        rule = Rule("test", "ProductName", condition, ACCEPT)
+        assert rule.compile() == (
+            "ProductName",
+            False,
+            False,
+            condition,
+            ACCEPT,
+            "test",
+            (ACCEPT, "test", 100),
+        )
+
+    def test_subclass_match(self, throttler):
+        # Throttler applies compiled rules, so make sure a subclass that overrides
+        # match still gets its match called
+        class OtherKeyRule(Rule):
+            def match(self, throttler, crash):
+                return crash.get("OtherKey") == "test"
+
+        throttler.rule_set = [
+            OtherKeyRule("test", "ProductName", lambda throttler, x: True, ACCEPT)
+        ]
+
+        assert throttler.throttle({"OtherKey": "test"}) == (ACCEPT, "test", 100)
+        assert throttler.throttle({"ProductName": "Test"}) == (REJECT, "NO_MATCH", 0)
+
 
 class TestACCEPT_ALL:
     def test_ruleset(self):
@@ -111,6 +151,14 @@ class Test_match_infobar_true:
             ("54.0", True),
             ("53.0", True),
             ("52.0", True),
+            # Versions that don't start with an affected "NN." prefix are fine
+            ("57", False),
+            ("5a.0", False),
+            ("abc", False),
+            ("052.0", False),
+            # Non-ascii digits aren't affected prefixes
+            ("\u00b2.0", False),
+            ("\u0665\u0662.0", False),
         ],
     )
     def test_versions(self, throttler, version, expected):
@@ -251,6 +299,15 @@ class Test_match_old_buildid:
             ("abc", False),
             ("20220404", False),
             ("11111111111111", False),
+            ("2017010100000a", False),
+            # Not a valid month or day
+            ("20171301000000", False),
+            ("20170100000000", False),
+            ("20170231000000", False),
+            ("20170431000000", False),
+            ("20170229000000", False),
+            # Leap day is a real date
+            ("20160229000000", True),
         ],
     )
     def test_bad_data(self, throttler, buildid, expected):
@@ -276,6 +333,14 @@ class Test_match_old_buildid:
         raw_crash = {"BuildID": buildid}
         assert match_old_buildid(throttler, raw_crash) == expected
 
+    def test_cutoff_changes_with_date(self, throttler):
+        raw_crash = {"BuildID": "20180529000000"}
+        with freeze_time("2020-05-27 12:00:00", tz_offset=0):
+            assert match_old_buildid(throttler, raw_crash) is False
+
+        with freeze_time("2020-05-28 12:00:00", tz_offset=0):
+            assert match_old_buildid(throttler, raw_crash) is True
+
 
 class Testmozilla_rules:
     def test_bad_data(self, throttler):
@@ -8,6 +8,7 @@ from freezegun import freeze_time
 import pytest
 
 from antenna.util import (
+    UTC,
     MaxAttemptsError,
     create_crash_id,
     get_date_from_crash_id,
@@ -59,6 +60,29 @@ def test_crash_id():
     assert get_throttle_from_crash_id(crash_id) == 1
 
 
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        ("2011-09-06 00:00:00", "20110906"),
+        ("2011-09-06 23:59:59", "20110906"),
+        ("2012-02-29 12:00:00", "20120229"),
+    ],
+)
+def test_crash_id_default_date(now, expected):
+    with freeze_time(now, tz_offset=0):
+        crash_id = create_crash_id()
+    assert get_date_from_crash_id(crash_id) == expected
+
+
+def test_crash_id_is_valid():
+    crash_id = create_crash_id()
+
+    assert validate_crash_id(crash_id) is True
+    # The random part is a version 4 UUID
+    assert crash_id[14] == "4"
+    assert crash_id[19] in "89ab"
+
+
 def test_crash_id_with_throttle():
     crash_id = create_crash_id(throttle_result=0)
 
@@ -70,6 +94,9 @@ def test_crash_id_with_date():
     crash_id = create_crash_id(datetime(2016, 10, 4))
 
     assert get_date_from_crash_id(crash_id) == "20161004"
+    assert get_date_from_crash_id(crash_id, as_datetime=True) == datetime(
+        2016, 10, 4, tzinfo=UTC
+    )
 
 
 @pytest.mark.parametrize(
@@ -82,6 +109,7 @@ def test_crash_id_with_date():
         ("DE1BB258-CBBF-4589-A673-34F800160918", True, False),
         ("aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa", True, False),
         ("00000000-0000-0000-0000-000000000000", True, True),
+        ("de1bb258-cbbf-4589-a673-34f800160918\n", True, False),
         # Test throttle character
         ("de1bb258-cbbf-4589-a673-34f800160918", True, True),
         ("de1bb258-cbbf-4589-a673-34f801160918", True, True),
@@ -107,6 +135,11 @@ def test_validate_crash_id(data, strict, expected):
         # Sanitize non-ascii characters
         ("upload\u0394_file_minidump", "upload_file_minidump"),
         ("upload_file_m\xef\xbf\xbdnidump", "upload_file_mnidump"),
+        # Sanitize punctuation and whitespace
+        ("upload-file minidump.dmp", "uploadfileminidumpdmp"),
+        # Truncate to 30 characters
+        ("a" * 40, "a" * 30),
+        (b"upload_file_minidump", "upload_file_minidump"),
     ],
 )
 def test_sanitize_key_name(data, expected):
@@ -242,3 +275,13 @@ class Test_retry:
         with pytest.raises(MaxAttemptsError):
             some_thing()
         assert fake_sleep.sleeps == [1, 1, 2, 2, 1, 1]
+
+    def test_wait_time_generator_not_called_on_success(self):
+        def waits():
+            raise AssertionError("wait_time_generator should not be called")
+
+        @retry(wait_time_generator=waits)
+        def some_thing():
+            return 1
+
+        assert some_thing() == 1